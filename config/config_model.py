@@ -276,6 +276,14 @@ class CommunicationConfig(BaseModel):
     )
 
 
+# CommunicationConfig field holding each channel's gateway
+_CHANNEL_GATEWAY_FIELD = {
+    Channel.email: "email_gateway",
+    Channel.sms: "sms_gateway",
+    Channel.snapchat: "snapchat_gateway",
+}
+
+
 class MQTTConfig(BaseModel):
     """MQTT broker connection settings."""
     broker_host: str = Field("localhost", description="MQTT broker hostname or IP")
@@ -358,11 +366,13 @@ class ConfigModel(BaseModel):
         """
         Return first configured gateway for a person in their preference order.
         """
+        comm = self.communication
         for channel in person.preferred_comm:
-            if channel == Channel.email and self.communication.email_gateway:
-                return channel, self.communication.email_gateway
-            if channel == Channel.sms and self.communication.sms_gateway:
-                return channel, self.communication.sms_gateway
-            if channel == Channel.snapchat and self.communication.snapchat_gateway:
-                return channel, self.communication.snapchat_gateway
+            # Looked up per call, not cached: gateways can be edited at runtime
+            field = _CHANNEL_GATEWAY_FIELD.get(channel)
+            if field is None:
+                continue
+            gateway = getattr(comm, field)
+            if gateway:
+                return channel, gateway
         return None
@@ -1,20 +1,39 @@
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from loguru import logger
-from typing import Dict, Literal, Optional
-from pydantic import BaseModel, Field, model_validator
+from typing import Literal
+from pydantic import BaseModel, Field, field_validator
 from config.config_model import Channel
+from controller.event_store import EventStore, TransactionEvent
 import json
 import os
 
 
+# Flags for the temp file; O_BINARY/O_CLOEXEC only exist on some platforms
+_TMP_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+              | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0))
+# fdatasync skips the metadata flush where available (not on Windows/macOS)
+_sync = getattr(os, "fdatasync", os.fsync)
+
+
 @logger.catch()
-def atomic_write(path: str, data: str) -> None:
+def atomic_write(path: str, data: str | bytes) -> None:
     """
     Write data to a temp file and atomically replace the target path to avoid corruption.
+
+    The temp file is synced before the rename, so a power loss leaves either
+    the old file or the complete new one, never an empty replacement.
     """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
     tmp_path = f"{path}.tmp"
-    with open(tmp_path, "w") as f:
-        f.write(data)
+    fd = os.open(tmp_path, _TMP_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        _sync(fd)
+    finally:
+        os.close(fd)
     os.replace(tmp_path, path)
 
 
@@ -29,53 +48,62 @@ class ChannelState(BaseModel):
     channel: Channel
     revenue: float = 0.0
     transactions: int = 0
-    last_transaction: Optional[datetime] = None
+    last_transaction: datetime | None = None
 
-    @model_validator(mode="after")
-    def ensure_timestamp(cls, values):
-        # Ensure last_transaction is timezone-aware or None
-        ts = values.last_transaction
+    @field_validator("last_transaction")
+    @classmethod
+    def ensure_timestamp(cls, ts: datetime | None) -> datetime | None:
+        # Ensure last_transaction is timezone-aware or None. A field validator
+        # only runs when a timestamp is supplied, not on every new ChannelState.
         if ts and ts.tzinfo is None:
-            values.last_transaction = ts.replace(tzinfo=timezone.utc)
-        return values
+            return ts.replace(tzinfo=UTC)
+        return ts
 
 
 class MachineState(BaseModel):
     # Restrict FSM state to known values
     fsm_state: Literal["idle", "interacting_with_user", "dispensing", "error"]
     credit_escrow: float = 0.0
-    current_sku: Optional[str] = None
-    channel_states: Dict[Channel, ChannelState] = Field(default_factory=dict)
-    product_states: Dict[str, ProductState] = Field(default_factory=dict)
+    current_sku: str | None = None
+    channel_states: dict[Channel, ChannelState] = Field(default_factory=dict)
+    product_states: dict[str, ProductState] = Field(default_factory=dict)
     # Use a timezone-aware default
-    last_updated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_updated: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
     def record_transaction(
         self,
         channel: Channel,
         sku: str,
         amount: float,
-        timestamp: Optional[datetime] = None
+        timestamp: datetime | None = None,
+        event_store: EventStore | None = None,
     ) -> None:
         """
         Update channel and product stats for a completed vend.
+
+        With an event_store the vend is also appended to its log, and flushed,
+        so the state can be rebuilt by from_event_store() after a crash without
+        rewriting a state file.
         """
-        ts = timestamp or datetime.utcnow()
+        ts = timestamp or datetime.now(UTC)
+        if event_store is not None:
+            event_store.append_event(
+                TransactionEvent(timestamp=ts, channel=channel, sku=sku, amount=amount),
+                durable=True,
+            )
         # Update channel state
         ch_state = self.channel_states.get(channel)
-        if not ch_state:
-            ch_state = ChannelState(channel=channel)
-            self.channel_states[channel] = ch_state
+        if ch_state is None:
+            ch_state = self.channel_states[channel] = ChannelState(channel=channel)
         ch_state.revenue += amount
         ch_state.transactions += 1
         ch_state.last_transaction = ts
 
         # Update product state
         prod_state = self.product_states.get(sku)
-        if not prod_state:
+        if prod_state is None:
             # First-time seeing this SKU; initialize
-            prod_state = ProductState(sku=sku, inventory_count=0)
-            self.product_states[sku] = prod_state
+            prod_state = self.product_states[sku] = ProductState(sku=sku, inventory_count=0)
         prod_state.vend_count += 1
         prod_state.revenue += amount
 
@@ -84,11 +112,30 @@ class MachineState(BaseModel):
         self.current_sku = None
         self.last_updated = ts
 
+    def snapshot(self, event_store: EventStore) -> None:
+        """
+        Checkpoint into the event store; a no-op until snapshot_every events
+        have been logged since the last snapshot.
+        """
+        event_store.checkpoint(self.model_dump(mode="json"))
+
+    @classmethod
+    def from_event_store(cls, event_store: EventStore) -> "MachineState":
+        """
+        Rebuild state from the latest snapshot plus the transactions logged after it.
+        """
+        snapshot = event_store.load_latest_snapshot()
+        state = cls.model_validate(snapshot.state) if snapshot else cls(fsm_state="idle")
+        # The log was written by record_transaction, so skip re-validating it
+        for event in event_store.replay_events(TransactionEvent, trusted=True):
+            state.record_transaction(Channel(event.channel), event.sku, event.amount, event.timestamp)
+        return state
+
     def to_file(self, path: str) -> None:
         """
         Serialize state to JSON file with atomic replace.
         """
-        data = self.model_dump_json(indent=2)
+        data = self.model_dump_json(indent=2).encode("utf-8")
         atomic_write(path, data)
 
     @classmethod
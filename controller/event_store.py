@@ -1,37 +1,46 @@
+import functools
 import json
-from datetime import datetime, timezone
+import mmap
+import os
+import weakref
+from datetime import UTC, datetime
 from loguru import logger
 from pathlib import Path
-from typing import List, Type, TypeVar, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, TypeVar
+from pydantic import BaseModel, Field, PlainSerializer, TypeAdapter
 
 # Generic type for events
 E = TypeVar('E', bound='EventBase')
 
+# datetime rendered with isoformat() in JSON (pydantic's default would write "Z"
+# for UTC); attached to the field so no deprecated json_encoders lookup is needed
+IsoDatetime = Annotated[datetime, PlainSerializer(datetime.isoformat, return_type=str, when_used="json")]
+
+
 class EventBase(BaseModel):
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: IsoDatetime = Field(default_factory=lambda: datetime.now(UTC))
     type: str
 
-    # Centralize ISO-format JSON encoding for all datetime fields
-    model_config = {
-        "json_encoders": {
-            datetime: lambda dt: dt.isoformat()
-        }
-    }
-
 class TransactionEvent(EventBase):
     type: str = Field(default='transaction')
     channel: str
     sku: str
     amount: float
-    fsm_state_before: Optional[str]
-    fsm_state_after: Optional[str]
+    # Only set by callers that drive an FSM transition around the sale
+    fsm_state_before: str | None = None
+    fsm_state_after: str | None = None
 
 class SnapshotEvent(EventBase):
     type: str = Field(default='snapshot')
     # embed full state snapshot as JSON string (or dict)
     state: dict
 
+@functools.lru_cache(maxsize=32)
+def _adapter(event_type: type[EventBase]) -> TypeAdapter:
+    """One TypeAdapter per event class, reused for every line read or written."""
+    return TypeAdapter(event_type)
+
+
 class EventStore:
     def __init__(self, log_path: Path, snapshot_path: Path, snapshot_every: int = 100):
         self.log_path = log_path
@@ -42,52 +51,106 @@ class EventStore:
         # Ensure files exist
         self.log_path.touch(exist_ok=True)
         self.snapshot_path.touch(exist_ok=True)
+        # Held open for the store's lifetime so appends are buffered writes,
+        # not an open/write/close per event. Buffered events reach the file on
+        # a durable append, flush(), replay_events(), a snapshot or close();
+        # a store dropped without close() is flushed when it is collected.
+        self._open_log('ab')
+
+    def __enter__(self):
+        return self
 
-    def append_event(self, event: EventBase) -> None:
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open_log(self, mode: str) -> None:
+        """Open the log handle and register it to be closed with the store."""
+        self._log_fh = self.log_path.open(mode, buffering=65536)
+        self._finalizer = weakref.finalize(self, self._log_fh.close)
+
+    def flush(self) -> None:
+        """Push buffered events to the log file."""
+        self._log_fh.flush()
+
+    def close(self) -> None:
+        """Flush and close the log file handle."""
+        self._finalizer()
+
+    def append_event(self, event: EventBase, durable: bool = False) -> None:
         """
-        Append a single event as a JSON line to the log file.
+        Append a single event as a JSON line to the log file (buffered).
+
+        durable=True flushes it to the file before returning, for events that
+        must survive a crash of this process.
         """
-        with self.log_path.open('a', encoding='utf-8') as f:
-            # Use Pydantic’s built-in JSON serializer
-            f.write(event.model_dump_json() + "\n")
+        # Pydantic's serializer emits bytes; no str round-trip
+        self._log_fh.write(_adapter(type(event)).dump_json(event))
+        self._log_fh.write(b"\n")
         self._events_since_snapshot += 1
+        if durable:
+            self._log_fh.flush()
 
-    def replay_events(self, event_type: Type[E]) -> List[E]:
+    def replay_events(self, event_type: type[E], trusted: bool = False) -> list[E]:
         """
         Read the log file and deserialize events of the given type.
+
+        trusted=True skips validation (model_construct) for logs this store
+        wrote itself; only the timestamp is converted back to a datetime.
         """
-        events: List[E] = []
-        with self.log_path.open('r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    payload = json.loads(line)
-                    if payload.get('type') == event_type.__fields__['type'].default:
-                        events.append(event_type.parse_obj(payload))
-                except json.JSONDecodeError as err:
-                    logger.warning(f"Skipping malformed event line: {err}")
-                    continue
+        self.flush()
+        events: list[E] = []
+        wanted = event_type.model_fields['type'].default
+        adapter = _adapter(event_type)
+        # append_event writes compact JSON, so a line of the wanted type always
+        # contains the needle. Lines with a compact "type" key but no needle
+        # belong to another event type and are skipped without parsing; any
+        # other line (hand-edited, malformed) is parsed and checked as before.
+        needle = json.dumps({'type': wanted}, separators=(',', ':'))[1:-1].encode()
+        with self.log_path.open('rb') as f:
+            # mmap can't map an empty file; an empty log has nothing to replay
+            if os.fstat(f.fileno()).st_size == 0:
+                return events
+            # Map the log read-only: lines are sliced from the page cache
+            # instead of copied through a read buffer
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b''):
+                    if needle not in line and b'"type":"' in line:
+                        continue
+                    try:
+                        payload = json.loads(line)
+                        if payload.get('type') != wanted:
+                            continue
+                        if trusted:
+                            if 'timestamp' in payload:
+                                payload['timestamp'] = datetime.fromisoformat(payload['timestamp'])
+                            events.append(event_type.model_construct(**payload))
+                        else:
+                            events.append(adapter.validate_python(payload))
+                    except json.JSONDecodeError as err:
+                        logger.warning(f"Skipping malformed event line: {err}")
+                        continue
         return events
 
-    def load_latest_snapshot(self) -> Optional[SnapshotEvent]:
+    def load_latest_snapshot(self) -> SnapshotEvent | None:
         """
         Load the last snapshot event from the snapshot file.
         """
-        with self.snapshot_path.open('r', encoding='utf-8') as f:
-            text = f.read().strip()
-            if not text:
-                return None
-            return SnapshotEvent.parse_raw(text)
+        raw = self.snapshot_path.read_bytes()
+        if not raw.strip():
+            return None
+        return _adapter(SnapshotEvent).validate_json(raw)
 
     def write_snapshot(self, state: dict) -> None:
         """
         Write a snapshot event to snapshot_path and reset the log.
         """
         snapshot = SnapshotEvent(state=state)
-        with self.snapshot_path.open('w', encoding='utf-8') as f:
-            # Consistently use Pydantic’s JSON dumper
-            f.write(snapshot.model_dump_json(indent=2))
-        # Clear the log
-        self.log_path.write_text('')
+        with self.snapshot_path.open('wb') as f:
+            # Compact bytes: snapshots are machine-read, indenting only adds size
+            f.write(_adapter(SnapshotEvent).dump_json(snapshot))
+        # Clear the log; anything still buffered is covered by the snapshot
+        self.close()
+        self._open_log('wb')
         self._events_since_snapshot = 0
 
     def checkpoint(self, state: dict) -> None:
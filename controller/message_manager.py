@@ -44,15 +44,17 @@ class TkinterWindowDisplay(DisplayDevice):
             self.root = tk.Toplevel()
             self.root.geometry(f"{width}x{height}")
         self.root.title("Display Manager")
-        # Label for showing text; supports multiline
-        self.label = tk.Label(self.root, text="", font=("Helvetica", 14), justify="left")
+        # Label for showing text; supports multiline. Bound to a StringVar so
+        # updates are a single variable set rather than a configure call.
+        self.text_var = tk.StringVar(master=self.root, value="")
+        self.label = tk.Label(self.root, textvariable=self.text_var, font=("Helvetica", 14), justify="left")
         self.label.pack(expand=True, fill="both")
 
     def show_text(self, message: str):
-        self.label.config(text=message)
+        self.text_var.set(message)
 
     def clear(self):
-        self.label.config(text="")
+        self.text_var.set("")
 
     def schedule(self, delay_ms: int, callback) -> str:
         # Use Tkinter's after to schedule
@@ -66,33 +68,61 @@ class TkinterWindowDisplay(DisplayDevice):
 class MessageManager:
     """
     Queues messages for sequential display, ensuring each is shown for its full duration.
+
+    With coalesce_window_ms set, consecutive short messages (duration at or
+    below the window) are shown together as one frame for their combined
+    duration, and a post while idle is deferred to the next device tick so a
+    burst of posts lands in the same frame.
     """
-    def __init__(self, device: DisplayDevice):
+    def __init__(self, device: DisplayDevice, coalesce_window_ms: int = 0):
         self.device = device
+        # Messages waiting to be shown; the one on screen is held in _current
         self.queue = deque()
+        self._current = None
         self.current_timer = None
+        self.coalesce_window_ms = coalesce_window_ms
 
     def post(self, message: str, duration_ms: int = 5000):
         """
-        Enqueue a message; if idle, start displaying immediately.
+        Enqueue a message; if idle, start displaying it (immediately, or on the
+        next tick when coalescing).
         """
         self.queue.append((message, duration_ms))
-        if len(self.queue) == 1:
-            self._display_next()
+        if self._current is None and self.current_timer is None:
+            if self.coalesce_window_ms > 0:
+                self.current_timer = self.device.schedule(0, self._display_next)
+            else:
+                self._display_next()
+
+    def _take_next(self):
+        """Pop the next message, merging any short messages that follow a short one."""
+        queue = self.queue
+        message, duration = queue.popleft()
+        window = self.coalesce_window_ms
+        if duration > window or not queue or queue[0][1] > window:
+            return message, duration
+        texts = [message]
+        while queue and queue[0][1] <= window:
+            text, extra = queue.popleft()
+            texts.append(text)
+            duration += extra
+        return "\n".join(texts), duration
 
     def _display_next(self):
+        self.current_timer = None
+        device = self.device
         if not self.queue:
-            self.device.clear()
+            self._current = None
+            device.clear()
             return
-        message, duration = self.queue[0]
-        self.device.show_text(message)
+        message, duration = self._take_next()
+        self._current = (message, duration)
+        device.show_text(message)
         # Schedule removal of this message
-        self.current_timer = self.device.schedule(duration, self._on_timeout)
+        self.current_timer = device.schedule(duration, self._on_timeout)
 
     def _on_timeout(self):
-        # Remove the message that just expired
-        self.queue.popleft()
-        # Display next or clear
+        # The message on screen has expired; display next or clear
         self._display_next()
 
     def clear_all(self):
@@ -101,5 +131,7 @@ class MessageManager:
         """
         if self.current_timer:
             self.device.cancel(self.current_timer)
+        self.current_timer = None
+        self._current = None
         self.queue.clear()
         self.device.clear()
@@ -10,51 +10,51 @@ class PaymentDeviceFSM(ABC):
     def __init__(self, device_name, callback=None):
         self.device_name = device_name
         self.callback = callback  # Expected to be a function with signature: callback(event_type: str, data: dict)
-        logger.debug(f"{self.device_name} FSM: __init__ called. Callback set: {bool(callback)}")
+        logger.debug("{} FSM: __init__ called. Callback set: {}", self.device_name, bool(callback))
 
     def register_callback(self, callback):
         """
         Register a callback to send progress or status updates to the primary VMC.
         """
         self.callback = callback
-        logger.debug(f"{self.device_name} FSM: register_callback called. Callback updated.")
+        logger.debug("{} FSM: register_callback called. Callback updated.", self.device_name)
 
     @abstractmethod
     def start_transaction(self):
         """Start the payment device transaction."""
-        logger.debug(f"{self.device_name} FSM: start_transaction invoked.")
+        logger.debug("{} FSM: start_transaction invoked.", self.device_name)
         raise NotImplementedError("start_transaction must be implemented by subclass")
 
     @abstractmethod
     def cancel_transaction(self):
         """Cancel the current transaction."""
-        logger.debug(f"{self.device_name} FSM: cancel_transaction invoked.")
+        logger.debug("{} FSM: cancel_transaction invoked.", self.device_name)
         raise NotImplementedError("cancel_transaction must be implemented by subclass")
 
     @abstractmethod
     def get_current_credit(self) -> float:
         """Return current credit value processed by the device."""
-        logger.debug(f"{self.device_name} FSM: get_current_credit invoked.")
+        logger.debug("{} FSM: get_current_credit invoked.", self.device_name)
         raise NotImplementedError("get_current_credit must be implemented by subclass")
 
     @abstractmethod
     def dispense_change(self):
         """Dispense any change required for the transaction."""
-        logger.debug(f"{self.device_name} FSM: dispense_change invoked.")
+        logger.debug("{} FSM: dispense_change invoked.", self.device_name)
         raise NotImplementedError("dispense_change must be implemented by subclass")
 
     def notify(self, event_type, data):
         """
         Notify the primary VMC of an event.
         """
-        logger.debug(f"{self.device_name} FSM: notify called with event_type='{event_type}', data={data}")
-        logger.info(f"{self.device_name} FSM: Notifying event '{event_type}' with data: {data}")
+        logger.debug("{} FSM: notify called with event_type='{}', data={}", self.device_name, event_type, data)
+        logger.info("{} FSM: Notifying event '{}' with data: {}", self.device_name, event_type, data)
         if self.callback:
-            logger.debug(f"{self.device_name} FSM: Executing callback for event '{event_type}'.")
+            logger.debug("{} FSM: Executing callback for event '{}'.", self.device_name, event_type)
             try:
                 self.callback(event_type, data)
-                logger.debug(f"{self.device_name} FSM: Callback executed successfully for event '{event_type}'.")
+                logger.debug("{} FSM: Callback executed successfully for event '{}'.", self.device_name, event_type)
             except Exception as e:
-                logger.exception(f"{self.device_name} FSM: Exception in callback for event '{event_type}': {e}")
+                logger.exception("{} FSM: Exception in callback for event '{}': {}", self.device_name, event_type, e)
         else:
-            logger.warning(f"{self.device_name} FSM: No callback registered; event '{event_type}' not delivered.")
+            logger.warning("{} FSM: No callback registered; event '{}' not delivered.", self.device_name, event_type)
@@ -1,7 +1,11 @@
 # controller/vmc.py
 import asyncio
+import concurrent.futures
+import functools
+import itertools
+import threading
 import time
-from transitions import Machine
+from transitions.extensions import LockedMachine
 from loguru import logger
 from services.payment_gateway_manager import PaymentGatewayManager
 from services.mqtt_messages import VMCStatus, PaymentEvent, ButtonPress, DispenseCommand, IceMakerEvent
@@ -12,12 +16,37 @@ from services.inventory_manager import InventoryManager
 
 STATE_CHANGE_PREFIX = "***### STATE CHANGE ###***"
 
+#: Parameterised customer-facing messages, filled in with ``str.format``.
+_MESSAGES = {
+    "deposit": "${amount:.2f} deposited. Current balance: ${balance:.2f}.",
+    "refund": "Refund of ${amount:.2f} issued via {method}.",
+    "virtual_payment": "Virtual Payment Option ({gateway}): Scan the QR code above.",
+    "sold_out": "{name} is sold out. Please select another product.",
+    "selection_short": "Changed selection to {name}. Insert additional ${required:.2f}.",
+    "selection_ok": "Changed selection to {name}. Sufficient funds available.",
+    "insufficient": "Insufficient funds. Please insert an additional ${required:.2f}.",
+}
+
 # Bound loggers — initialized lazily so sinks are installed before first use.
 # Module-level references are set by VMC.__init__() (after setup_logging() in main.py).
 txn_log = logger
 ice_log = logger
 vend_log = logger
 
+
+def _to_cents(dollars: float) -> int:
+    """Convert a dollar amount to integer cents (escrow is kept in cents)."""
+    return round(dollars * 100)
+
+
+def _locked(method):
+    """Run a VMC method while holding the instance's state lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 #: FSM transition table.
 #: Ordering matters when multiple transitions share the same trigger name.
 TRANSITIONS = [
@@ -73,13 +102,17 @@ class VMC:
         logger.debug("Initializing VMC with pre-loaded ConfigModel")
 
         self.config_model = config
-        logger.debug(self.config_model.model_dump_json(exclude_none=True, indent=2))
+        logger.opt(lazy=True).debug(
+            "{}", lambda: self.config_model.model_dump_json(exclude_none=True, indent=2)
+        )
 
         self.products = self.config_model.products
         self.owner_contact = self.config_model.machine_owner
 
         self.selected_product = None
-        self.credit_escrow = 0.0
+        # Escrow is kept in integer cents so repeated deposits and charges
+        # can't drift (0.70 + 0.10 < 0.80 in floats); see credit_escrow.
+        self._escrow_cents = 0
         self.last_insufficient_message = ""
         self.last_payment_method = "Simulated Payment"
 
@@ -87,10 +120,15 @@ class VMC:
         self.message_callback = None
         self.qrcode_callback = None
 
-        self._pending_tasks: list[asyncio.Task] = []
-        self._dispense_timeout_task: asyncio.Task | None = None
-        self._session_timeout_task: asyncio.Task | None = None
+        self._pending_tasks: list[asyncio.Task | concurrent.futures.Future] = []
+        self._payment_task: asyncio.Task | concurrent.futures.Future | None = None
+        self._funds_deposited = asyncio.Event()
+        self._dispense_timeout_task: asyncio.Task | concurrent.futures.Future | None = None
+        self._session_timeout_task: asyncio.Task | concurrent.futures.Future | None = None
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._status_publish_pending = False
+        # Created on first use; renders QR codes off the event loop thread
+        self._qr_executor: concurrent.futures.ThreadPoolExecutor | None = None
         self._mqtt_client = None  # Set via set_mqtt_client()
         self._health_monitor: HealthMonitor | None = None  # Set via set_health_monitor()
         self._display_controller: DisplayController | None = None  # Set via set_display_controller()
@@ -98,14 +136,26 @@ class VMC:
         self._start_time = time.monotonic()
         self._session_timeout_seconds = 180.0  # 3 minutes
 
-        self.machine = Machine(model=self, states=VMC.states, initial=VMC.states[0], auto_transitions=False)
+        # Guards credit_escrow / selected_product / state. Shared with the
+        # machine so triggers and business methods serialize on one RLock.
+        self._lock = threading.RLock()
+        self.machine = LockedMachine(
+            model=self,
+            states=VMC.states,
+            initial=VMC.states[0],
+            auto_transitions=False,
+            queued=True,
+            machine_context=[self._lock],
+        )
 
         for t in TRANSITIONS:
             self.machine.add_transition(**t)
         logger.debug("FSM transitions set up successfully.")
 
-        self.payment_gateway_manager = PaymentGatewayManager(config=self.config_model.payment.model_dump())
-        self.virtual_payment_index = 0
+        self.payment_gateway_manager = PaymentGatewayManager(config=self.config_model.payment)
+        # Round-robin over (name, gateway) pairs; None when nothing is configured
+        gateways = tuple(self.payment_gateway_manager.gateways.items())
+        self._gateway_cycle = itertools.cycle(gateways) if gateways else None
 
         logger.debug("VMC initialization complete.")
 
@@ -118,10 +168,14 @@ class VMC:
         """Cancel all pending scheduled tasks. Call during shutdown."""
         for task in self._pending_tasks:
             if not task.done():
-                task.cancel()
+                self._cancel_task(task)
         self._pending_tasks.clear()
+        self._cancel_payment_flow()
         self._cancel_dispense_timeout()
         self._cancel_session_timeout()
+        if self._qr_executor is not None:
+            self._qr_executor.shutdown(wait=False, cancel_futures=True)
+            self._qr_executor = None
         logger.debug("VMC: all pending tasks cancelled.")
 
     def set_mqtt_client(self, client):
@@ -162,9 +216,22 @@ class VMC:
             self._display_controller.update_for_state(target_state or self.state)
 
     def _publish_status(self):
-        """Publish current VMC status to MQTT (fire-and-forget)."""
+        """Queue a status publish to MQTT (fire-and-forget).
+
+        Calls made before the loop next runs collapse into a single publish of
+        the state at that point, so a burst of transitions sends one message
+        (and never the *source* state seen inside ``before`` callbacks).
+        """
         if self._mqtt_client is None or self._loop is None:
             return
+        if self._status_publish_pending:
+            return
+        self._status_publish_pending = True
+        self._loop.call_soon_threadsafe(self._flush_status)
+
+    def _flush_status(self):
+        """Publish the current status; runs on the event loop."""
+        self._status_publish_pending = False
         status = VMCStatus(
             state=self.state,
             credit_escrow=self.credit_escrow,
@@ -209,17 +276,18 @@ class VMC:
             vend_log.error(f"DISPENSE FAILED: slot {slot}, product '{product_name}', reason: {state}")
             logger.error(f"Dispenser error: {state}")
             # Refund the customer — the price was already deducted from escrow
-            price = self.selected_product.price if self.selected_product else 0
-            self.credit_escrow += price
-            txn_log.info(f"REFUND (dispense failure): ${price:.2f} returned to escrow")
-            self.error_occurred()
+            with self._lock:
+                price = self.selected_product.price if self.selected_product else 0
+                self._escrow_cents += _to_cents(price)
+                txn_log.info(f"REFUND (dispense failure): ${price:.2f} returned to escrow")
+                self.error_occurred()
         else:
             # Intermediate hardware states: motor_active, fill_complete, solenoid_open, etc.
             vend_log.info(f"DISPENSER: slot {slot}, state: {state}")
 
     async def _handle_mqtt_sensor(self, topic: str, data: dict):
         """Handle temperature/sensor reading from ESP32."""
-        logger.debug(f"MQTT sensor [{topic}]: {data}")
+        logger.debug("MQTT sensor [{}]: {}", topic, data)
         if self._health_monitor:
             location = data.get("location", topic.split("/")[-1] if "/" in topic else topic)
             value = data.get("value")
@@ -228,7 +296,7 @@ class VMC:
 
     async def _handle_mqtt_heartbeat(self, topic: str, data: dict):
         """Handle heartbeat from ESP32 subsystem."""
-        logger.debug(f"MQTT heartbeat [{topic}]: {data}")
+        logger.debug("MQTT heartbeat [{}]: {}", topic, data)
         if self._health_monitor:
             subsystem = data.get("subsystem", topic.split("/")[-1] if "/" in topic else topic)
             self._health_monitor.record_heartbeat(subsystem, data)
@@ -244,7 +312,32 @@ class VMC:
             detail = f" ({event.detail})" if event.detail else ""
             ice_log.info(f"{event.event.upper()}{detail}")
 
-    def _schedule(self, delay_seconds, callback) -> asyncio.Task | None:
+    def _on_loop_thread(self) -> bool:
+        """True when called from the thread running the attached event loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _spawn(self, coro) -> asyncio.Task | concurrent.futures.Future:
+        """Start *coro* on the event loop from any thread.
+
+        Web and payment-device threads call into the VMC, and create_task is
+        not thread-safe, so off the loop thread the coroutine goes through
+        run_coroutine_threadsafe. Its future can be cancelled from any thread.
+        """
+        if self._on_loop_thread():
+            return self._loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _cancel_task(self, task):
+        """Cancel a handle from _spawn(); asyncio tasks are cancelled on the loop."""
+        if isinstance(task, asyncio.Task) and not self._on_loop_thread() and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(task.cancel)
+        else:
+            task.cancel()
+
+    def _schedule(self, delay_seconds, callback) -> asyncio.Task | concurrent.futures.Future | None:
         """Schedule a synchronous callback to run after delay_seconds on the event loop."""
         if self._loop is None or self._loop.is_closed():
             logger.warning("No event loop attached; cannot schedule callback.")
@@ -254,12 +347,44 @@ class VMC:
             await asyncio.sleep(delay_seconds)
             callback()
 
-        task = self._loop.create_task(_delayed())
+        task = self._spawn(_delayed())
         self._pending_tasks.append(task)
         # Clean up finished tasks
         self._pending_tasks = [t for t in self._pending_tasks if not t.done()]
         return task
 
+    def _start_payment_flow(self):
+        """(Re)start the payment coroutine for the current selection.
+
+        A re-selection cancels the previous flow, so only one payment check
+        is ever pending per transaction.
+        """
+        self._cancel_payment_flow()
+        if self._loop is None or self._loop.is_closed():
+            logger.warning("No event loop attached; cannot start payment flow.")
+            return
+        self._payment_task = self._spawn(self._payment_flow())
+        self._pending_tasks.append(self._payment_task)
+        self._pending_tasks = [t for t in self._pending_tasks if not t.done()]
+
+    def _cancel_payment_flow(self):
+        """Cancel the payment coroutine if it is still pending."""
+        if self._payment_task and not self._payment_task.done():
+            self._cancel_task(self._payment_task)
+        self._payment_task = None
+
+    async def _payment_flow(self):
+        """Check escrow after a short delay, then re-check on each deposit (or every 5s)."""
+        await asyncio.sleep(1.0)
+        while True:
+            self._funds_deposited.clear()
+            if not self._process_payment():
+                return
+            try:
+                await asyncio.wait_for(self._funds_deposited.wait(), timeout=5.0)
+            except TimeoutError:
+                pass
+
     def get_status(self) -> dict:
         return {
             "state": self.state,
@@ -268,27 +393,32 @@ class VMC:
             "last_payment_method": self.last_payment_method,
         }
 
-    @logger.catch()
     def set_qrcode_callback(self, callback):
         self.qrcode_callback = callback
 
-    @logger.catch()
+    @property
+    def credit_escrow(self) -> float:
+        """Customer credit in dollars (stored as integer cents)."""
+        return self._escrow_cents / 100
+
+    @credit_escrow.setter
+    def credit_escrow(self, dollars: float):
+        self._escrow_cents = _to_cents(dollars)
+
     def has_credit(self):
         """Return True if there is remaining credit in the escrow."""
-        return self.credit_escrow > 0
+        return self._escrow_cents > 0
 
-    @logger.catch()
     def set_update_callback(self, callback):
         self.update_callback = callback
 
-    @logger.catch()
     def set_message_callback(self, callback):
         self.message_callback = callback
 
     @logger.catch()
     def send_customer_message(self, message):
         """Send a message to the customer via the registered callback."""
-        logger.debug(f"Sending customer message: '{message}'")
+        logger.debug("Sending customer message: '{}'", message)
         self._display_message(message)
 
     @logger.catch()
@@ -323,13 +453,11 @@ class VMC:
         if self._mqtt_client and self._loop and self.selected_product:
             slot = self.products.index(self.selected_product)
             vend_log.info(f"DISPENSE CMD: slot {slot}, product '{self.selected_product.name}'")
-            self._loop.create_task(
-                self._mqtt_client.publish("cmd/dispense", DispenseCommand(slot=slot))
-            )
+            self._spawn(self._mqtt_client.publish("cmd/dispense", DispenseCommand(slot=slot)))
 
     def _post_dispense_dest(self) -> str:
         """Return the FSM destination after dispensing: continue if credit remains, else idle."""
-        return "interacting_with_user" if self.credit_escrow > 0 else "idle"
+        return "interacting_with_user" if self._escrow_cents > 0 else "idle"
 
     @logger.catch()
     def on_complete_transaction(self):
@@ -338,7 +466,7 @@ class VMC:
         self._publish_status()
         self._update_display(dest)
         self._refresh_ui()
-        if self.credit_escrow > 0:
+        if self._escrow_cents > 0:
             self.send_customer_message("Transaction complete. You have remaining credit. Please select another product if desired.")
         else:
             self.send_customer_message("Transaction complete. Thank you for your purchase!")
@@ -356,9 +484,9 @@ class VMC:
     def on_error(self):
         logger.error(f"{STATE_CHANGE_PREFIX} Error encountered for product: {self.selected_product}. Transitioning to error state.")
         # Refund any remaining credit in escrow
-        if self.credit_escrow > 0:
+        if self._escrow_cents > 0:
             refund = self.credit_escrow
-            self.credit_escrow = 0.0
+            self._escrow_cents = 0
             txn_log.info(f"REFUND (error state): ${refund:.2f} via {self.last_payment_method}")
             logger.info(f"Refunded ${refund:.2f} due to error state transition.")
         self._publish_status()
@@ -368,26 +496,33 @@ class VMC:
 
     # --- Business Logic Methods ---
     @logger.catch()
+    @_locked
     def deposit_funds(self, amount, payment_method="Simulated Payment"):
-        logger.debug(f"Depositing funds: amount={amount:.2f}, method={payment_method}")
-        self.credit_escrow += amount
+        logger.debug("Depositing funds: amount={:.2f}, method={}", amount, payment_method)
+        self._escrow_cents += _to_cents(amount)
         self.last_payment_method = payment_method
         logger.info(f"Deposited ${amount:.2f} via {payment_method}. New escrow: ${self.credit_escrow:.2f}")
         if self.state == "interacting_with_user":
             self._reset_session_timeout()
+        if self._loop is not None and not self._loop.is_closed():
+            # asyncio.Event is not thread-safe; set it on the loop
+            self._loop.call_soon_threadsafe(self._funds_deposited.set)
+        else:
+            self._funds_deposited.set()
         self._publish_status()
         self._refresh_ui()
-        self.send_customer_message(f"${amount:.2f} deposited. Current balance: ${self.credit_escrow:.2f}.")
+        self.send_customer_message(_MESSAGES["deposit"].format(amount=amount, balance=self.credit_escrow))
 
     @logger.catch()
+    @_locked
     def request_refund(self):
-        logger.debug(f"Requesting refund with current credit: {self.credit_escrow:.2f}")
-        if self.credit_escrow > 0:
+        logger.debug("Requesting refund with current credit: {:.2f}", self.credit_escrow)
+        if self._escrow_cents > 0:
             refund_amount = self.credit_escrow
-            self.credit_escrow = 0.0
+            self._escrow_cents = 0
             logger.info(f"Refund of ${refund_amount:.2f} issued via {self.last_payment_method}.")
             txn_log.info(f"REFUND ISSUED: ${refund_amount:.2f} via {self.last_payment_method}")
-            self.send_customer_message(f"Refund of ${refund_amount:.2f} issued via {self.last_payment_method}.")
+            self.send_customer_message(_MESSAGES["refund"].format(amount=refund_amount, method=self.last_payment_method))
             self._refresh_ui()
         else:
             self.send_customer_message("No funds to refund.")
@@ -398,27 +533,52 @@ class VMC:
         Initiates a virtual payment by generating a payment URL and corresponding QR code.
         Cycles through available virtual payment gateways.
         """
-        gateways = list(self.payment_gateway_manager.gateways.keys())
-        logger.debug(f"Available virtual payment gateways: {gateways}")
-        if not gateways:
+        if self._gateway_cycle is None:
             logger.error("No virtual payment gateways configured.")
             self.send_customer_message("Virtual payment is currently unavailable.")
             return
 
-        current_gateway = gateways[self.virtual_payment_index]
+        current_gateway, gateway = next(self._gateway_cycle)
         logger.info(f"Initiating virtual payment via {current_gateway} for amount ${amount:.2f}")
-        payment_url = self.payment_gateway_manager.gateways[current_gateway].generate_payment_url(amount)
-        logger.debug(f"Generated payment URL: {payment_url}")
+        payment_url = gateway.generate_payment_url(amount)
+        logger.debug("Generated payment URL: {}", payment_url)
 
-        qr_image = self.payment_gateway_manager.generate_qr_code(current_gateway, amount)
+        self._render_qrcode(gateway, payment_url)
+        self.send_customer_message(_MESSAGES["virtual_payment"].format(gateway=current_gateway))
+
+    def _render_qrcode(self, gateway, payment_url):
+        """
+        Render the payment QR code and hand it to qrcode_callback.
+
+        With a loop attached the encode runs on a worker thread and the callback
+        is delivered back on the loop, so a cache miss doesn't stall it.
+        """
+        if self.qrcode_callback is None:
+            return
+        if self._loop is None:
+            self.qrcode_callback(gateway.generate_qr_code(payment_url))
+            return
+        if self._qr_executor is None:
+            self._qr_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="vmc-qr")
+        future = self._qr_executor.submit(gateway.generate_qr_code, payment_url)
+        future.add_done_callback(
+            functools.partial(self._loop.call_soon_threadsafe, self._deliver_qrcode))
+
+    def _deliver_qrcode(self, future: concurrent.futures.Future):
+        """Pass a rendered QR code to qrcode_callback; runs on the event loop."""
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"QR code rendering failed: {future.exception()}")
+            return
         if self.qrcode_callback:
-            self.qrcode_callback(qr_image)
-        self.send_customer_message(f"Virtual Payment Option ({current_gateway}): Scan the QR code above.")
-        self.virtual_payment_index = (self.virtual_payment_index + 1) % len(gateways)
+            self.qrcode_callback(future.result())
 
     @logger.catch()
+    @_locked
     def select_product(self, product_index):
-        logger.debug(f"Selecting product with index: {product_index}")
+        logger.debug("Selecting product with index: {}", product_index)
         if self.state not in ["idle", "interacting_with_user"]:
             logger.warning("Cannot change selection; machine not ready.")
             return
@@ -434,66 +594,73 @@ class VMC:
         if self._inventory and not self._inventory.is_available(self.selected_product.sku):
             logger.error(f"{self.selected_product.name} is sold out.")
             txn_log.info(f"SOLD OUT: '{self.selected_product.name}', customer rejected")
-            self.send_customer_message(f"{self.selected_product.name} is sold out. Please select another product.")
+            self.send_customer_message(_MESSAGES["sold_out"].format(name=self.selected_product.name))
             return
 
         if self.state == "idle":
             self.start_interaction()
-            self._schedule(1.0, self._process_payment)
+            self._start_payment_flow()
         elif self.state == "interacting_with_user":
             self.initiate_virtual_payment(self.selected_product.price)
-            self._schedule(1.0, self._process_payment)
+            self._start_payment_flow()
         self._refresh_ui()
 
     @logger.catch()
     def _update_selection_message(self):
-        price = self.selected_product.price if self.selected_product else 0
+        price_cents = _to_cents(self.selected_product.price) if self.selected_product else 0
         if self.selected_product:
-            if self.credit_escrow < price:
-                required = price - self.credit_escrow
-                message = f"Changed selection to {self.selected_product.name}. Insert additional ${required:.2f}."
+            if self._escrow_cents < price_cents:
+                required = (price_cents - self._escrow_cents) / 100
+                message = _MESSAGES["selection_short"].format(name=self.selected_product.name, required=required)
             else:
-                message = f"Changed selection to {self.selected_product.name}. Sufficient funds available."
+                message = _MESSAGES["selection_ok"].format(name=self.selected_product.name)
         else:
             message = "No product selected."
-        logger.debug(f"Updated selection message: {message}")
+        logger.debug("Updated selection message: {}", message)
         self.send_customer_message(message)
         self.last_insufficient_message = message
 
     @logger.catch()
-    def _process_payment(self):
-        logger.debug(f"Processing payment for product: {self.selected_product}")
+    @_locked
+    def _process_payment(self) -> bool:
+        """Charge the escrow if it covers the selection.
+
+        Returns True while still waiting for more funds, False otherwise.
+        """
+        logger.debug("Processing payment for product: {}", self.selected_product)
         if self.state != "interacting_with_user":
             logger.debug("State is not interacting_with_user; aborting payment process.")
-            return
+            return False
 
         price = self.selected_product.price if self.selected_product else 0
-        if self.credit_escrow >= price:
+        price_cents = _to_cents(price)
+        if self._escrow_cents >= price_cents:
             logger.info(f"{STATE_CHANGE_PREFIX} Escrow sufficient ({self.credit_escrow:.2f} >= {price:.2f}). Processing payment.")
             txn_log.info(f"PAYMENT SUFFICIENT: ${self.credit_escrow:.2f} >= ${price:.2f} for '{self.selected_product.name}', charging ${price:.2f}")
             self.send_customer_message("Sufficient funds received. Processing your payment...")
-            self.credit_escrow -= price
-            logger.debug(f"Deducted price from escrow. New escrow: {self.credit_escrow:.2f}")
+            self._escrow_cents -= price_cents
+            logger.debug("Deducted price from escrow. New escrow: {:.2f}", self.credit_escrow)
             self.dispense_product()
             self._refresh_ui()
             # Dispenser hardware will send "complete" via MQTT → _handle_mqtt_dispenser
             # Schedule a timeout fallback in case the hardware never responds
             self._dispense_timeout_task = self._schedule(60.0, self._finish_dispensing)
             self.last_insufficient_message = ""
+            return False
         else:
-            required = price - self.credit_escrow
-            message = f"Insufficient funds. Please insert an additional ${required:.2f}."
+            required = (price_cents - self._escrow_cents) / 100
+            message = _MESSAGES["insufficient"].format(required=required)
             if message != self.last_insufficient_message:
                 logger.error(message)
                 txn_log.info(f"PAYMENT INSUFFICIENT: ${self.credit_escrow:.2f} < ${price:.2f} for '{self.selected_product.name}', need ${required:.2f} more")
                 self.send_customer_message(message)
                 self.last_insufficient_message = message
-            self._schedule(5.0, self._process_payment)
+            return True
 
     def _reset_session_timeout(self):
         """Reset (or start) the customer session inactivity timer."""
         if self._session_timeout_task and not self._session_timeout_task.done():
-            self._session_timeout_task.cancel()
+            self._cancel_task(self._session_timeout_task)
         self._session_timeout_task = self._schedule(
             self._session_timeout_seconds, self._expire_session
         )
@@ -501,10 +668,11 @@ class VMC:
     def _cancel_session_timeout(self):
         """Cancel the session timeout (e.g., when dispensing starts)."""
         if self._session_timeout_task and not self._session_timeout_task.done():
-            self._session_timeout_task.cancel()
+            self._cancel_task(self._session_timeout_task)
         self._session_timeout_task = None
 
     @logger.catch()
+    @_locked
     def _expire_session(self):
         """Called when the customer session times out due to inactivity."""
         if self.state != "interacting_with_user":
@@ -523,12 +691,13 @@ class VMC:
     def _cancel_dispense_timeout(self):
         """Cancel the dispense fallback timeout if it is still pending."""
         if self._dispense_timeout_task and not self._dispense_timeout_task.done():
-            self._dispense_timeout_task.cancel()
+            self._cancel_task(self._dispense_timeout_task)
         self._dispense_timeout_task = None
 
     @logger.catch()
+    @_locked
     def _finish_dispensing(self):
-        logger.debug(f"Finishing dispensing process for product: {self.selected_product}")
+        logger.debug("Finishing dispensing process for product: {}", self.selected_product)
         self._cancel_dispense_timeout()
         if self.state != "dispensing":
             logger.debug("State is not dispensing; cannot finish dispensing.")
@@ -39,7 +39,7 @@ class DispenseFSM:
             return "completed"
         except Exception as e:
             self.fail()
-            logger.error(f"DispenseFSM: Error during dispensing process: {e}")
+            logger.error("DispenseFSM: Error during dispensing process: {}", e)
             return "error"
 
 # Example usage within VMC (main controller) in vmc.py:
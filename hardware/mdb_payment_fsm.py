@@ -27,12 +27,12 @@ class MDBPaymentFSM(AsyncPaymentFSM):
 
     async def get_status(self) -> dict:
         status = {"current_credit": self.current_credit}
-        logger.debug(f"MDBPaymentFSM: Returning status: {status}")
+        logger.debug("MDBPaymentFSM: Returning status: {}", status)
         return status
 
     async def dispense_change(self):
         if self.current_credit > 0:
-            logger.info(f"MDBPaymentFSM: Dispensing change: ${self.current_credit:.2f}")
+            logger.info("MDBPaymentFSM: Dispensing change: ${:.2f}", self.current_credit)
             change = self.current_credit
             self.current_credit = 0.0
             self.notify("change_dispensed", {"device": "MDB", "amount": change})
@@ -51,7 +51,7 @@ class MDBPaymentFSM(AsyncPaymentFSM):
         if amount > self.current_credit:
             amount = self.current_credit  # Refund whatever is available
         self.current_credit -= amount
-        logger.info(f"MDBPaymentFSM: Refunding ${amount:.2f}. Remaining credit: ${self.current_credit:.2f}")
+        logger.info("MDBPaymentFSM: Refunding ${:.2f}. Remaining credit: ${:.2f}", amount, self.current_credit)
         self.notify("refund_processed", {"device": "MDB", "refund_amount": amount})
         await asyncio.sleep(0.1)
         return amount
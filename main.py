@@ -1,35 +1,32 @@
-from controller.vmc import VMC
-from services.mqtt_client import MQTTClient
-from services.health_monitor import HealthMonitor
-from services.notifier import Notifier
-from services.display_controller import DisplayController
-from services.inventory_manager import InventoryManager
-
 import asyncio
-import json
 import os
 import sys
 
 from loguru import logger
 from pydantic import ValidationError
 
-import uvicorn
 from config.config_model import ConfigModel
-from web_interface.server import app
-from web_interface import routes
 
-def setup_logging():
+def setup_logging(log_dir: str = "LOGS"):
     """
     Set up logging configuration for the application.
+
+    Only called from main(); importing this module installs no sinks. Tests and
+    tools can opt in with a scratch log_dir. Returns the path of the main
+    vmc.log file so the dashboard can tail it.
     """
-    # Create the LOGS subdirectory if it doesn't exist
-    os.makedirs("LOGS", exist_ok=True)
+    # Create the log directory if it doesn't exist
+    os.makedirs(log_dir, exist_ok=True)
 
     # Remove any default logging handlers
     logger.remove()
+    # File sinks use enqueue=True: records are handed to a background writer so
+    # disk I/O never blocks the event loop. Console output stays synchronous.
     # log file with rotation and retention settings
+    vmc_log_path = os.path.join(log_dir, "vmc.log")
     logger.add(
-        "LOGS/vmc.log",
+        vmc_log_path,
+        enqueue=True,
         serialize=False,
         rotation="00:00",
         retention="300 days",
@@ -45,7 +42,8 @@ def setup_logging():
     )
     # Transaction log — customer interactions only (button, payment, dispense, refund)
     logger.add(
-        "LOGS/transactions.log",
+        os.path.join(log_dir, "transactions.log"),
+        enqueue=True,
         filter=lambda record: record["extra"].get("transaction", False),
         rotation="00:00",
         retention="300 days",
@@ -54,7 +52,8 @@ def setup_logging():
     )
     # Ice maker log — power cycles, ice drops, and out-of-spec behavior
     logger.add(
-        "LOGS/ice_maker.log",
+        os.path.join(log_dir, "ice_maker.log"),
+        enqueue=True,
         filter=lambda record: record["extra"].get("ice_maker", False),
         rotation="00:00",
         retention="300 days",
@@ -63,13 +62,15 @@ def setup_logging():
     )
     # Vending machine log — button presses, dispense sequences, hardware events
     logger.add(
-        "LOGS/vending.log",
+        os.path.join(log_dir, "vending.log"),
+        enqueue=True,
         filter=lambda record: record["extra"].get("vending", False),
         rotation="00:00",
         retention="300 days",
         compression="zip",
         format="{time:YYYY-MM-DD HH:mm:ss} | {message}",
     )
+    return vmc_log_path
 
 
 def _generate_skeleton():
@@ -98,14 +99,16 @@ def load_config() -> ConfigModel:
         _generate_skeleton()
 
     try:
-        with open("config.json", encoding="utf-8") as f:
-            raw = json.load(f)
+        # Bytes go straight to pydantic-core's parser; no separate utf-8 decode
+        with open("config.json", "rb") as f:
+            raw = f.read()
     except Exception as e:
         logger.exception(f"Error reading 'config.json': {e}")
         sys.exit(1)
 
     try:
-        config_model = ConfigModel.model_validate(raw)
+        # Parse and validate in one pass in pydantic-core, no intermediate dict
+        config_model = ConfigModel.model_validate_json(raw)
         logger.info(f"Configuration loaded successfully: version={config_model.version}")
     except ValidationError as ve:
         logger.error("Configuration validation failed:")
@@ -119,7 +122,22 @@ def load_config() -> ConfigModel:
 
 @logger.catch()
 async def main():
-    setup_logging()
+    # Runtime-only imports live here so that importing this module (e.g. for
+    # load_config or setup_logging) doesn't build the FastAPI app or pull in
+    # uvicorn, aiomqtt and the VMC.
+    import uvicorn
+
+    from controller.vmc import VMC
+    from services.display_controller import DisplayController
+    from services.health_monitor import HealthMonitor
+    from services.inventory_manager import InventoryManager
+    from services.mqtt_client import MQTTClient
+    from services.notifier import Notifier
+    from web_interface import routes
+    from web_interface.server import app
+
+    log_path = setup_logging()
+    routes.set_log_path(log_path)
     logger.info("Starting Vending Machine Controller")
 
     live_config = load_config()
@@ -169,6 +187,8 @@ async def main():
     finally:
         vmc.cancel_pending_tasks()
         logger.info("Shutdown: cancelled pending VMC tasks")
+        # Drain the enqueued file sinks before the loop goes away
+        await logger.complete()
 
 
 if __name__ == "__main__":
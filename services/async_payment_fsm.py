@@ -9,18 +9,25 @@ class AsyncPaymentFSM(ABC):
     Provides a common interface for both physical (MDB-based)
     and virtual payment systems, including support for refunds.
     """
+    # High-rate progress events, logged at DEBUG so INFO sinks drop them before formatting
+    _QUIET_EVENTS = frozenset({"payment_pending"})
+
     def __init__(self, name: str, callback=None):
         self.name = name
         self.callback = callback
-        logger.debug(f"{self.name} AsyncPaymentFSM initialized.")
+        # Bound once so every event record carries the FSM name in `extra`
+        self._log = logger.bind(fsm=name)
+        logger.debug("{} AsyncPaymentFSM initialized.", self.name)
 
     def register_callback(self, callback):
         self.callback = callback
-        logger.debug(f"{self.name} AsyncPaymentFSM: Callback registered.")
+        logger.debug("{} AsyncPaymentFSM: Callback registered.", self.name)
 
     def notify(self, event_type, data):
-        logger.info(f"{self.name} AsyncPaymentFSM: Notifying event '{event_type}' with data: {data}")
-        if self.callback:
+        # Placeholders, not an f-string: loguru only formats `data` if a sink accepts the level
+        level = "DEBUG" if event_type in self._QUIET_EVENTS else "INFO"
+        self._log.log(level, "{} AsyncPaymentFSM: Notifying event '{}' with data: {}", self.name, event_type, data)
+        if self.callback is not None:
             self.callback(event_type, data)
 
     @abstractmethod
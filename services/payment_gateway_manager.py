@@ -1,8 +1,27 @@
 # services/payment_gateway_manager.py
 import asyncio
-import qrcode
+import functools
 from loguru import logger
 
+from config.config_model import PaymentConfig
+
+# Recently rendered QR codes, keyed by payment URL. A repeated request for the
+# same amount on the same gateway reuses the image instead of re-encoding it.
+QR_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=QR_CACHE_SIZE)
+def _render_qr_code(payment_url: str):
+    """Render a QR code image for payment_url (cached; treat the result as read-only)."""
+    # Imported here: qrcode is only needed once a customer picks virtual
+    # payment, and it is the heaviest import on the controller.vmc path.
+    import qrcode
+
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(payment_url)
+    qr.make(fit=True)
+    return qr.make_image(fill_color="black", back_color="white")
+
 
 class BaseGateway:
     def __init__(self, config):
@@ -29,11 +48,7 @@ class BaseGateway:
         """
         Generate a QR code image for the given payment URL.
         """
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        qr.add_data(payment_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        return img
+        return _render_qr_code(payment_url)
 
 
 class StripeGateway(BaseGateway):
@@ -49,16 +64,17 @@ class SquareGateway(BaseGateway):
 
 
 class PaymentGatewayManager:
-    def __init__(self, config: dict = None):
+    def __init__(self, config: PaymentConfig | None = None):
         """
         Initialize the manager with configuration for each gateway.
-        The config dict can contain settings for 'stripe', 'paypal', and 'square'.
+        Takes the typed PaymentConfig directly (no model_dump); gateways it has
+        no section for, such as 'square', get None.
         """
-        self.config = config or {}
+        self.config = config
         self.gateways = {
-            "stripe": StripeGateway(self.config.get("stripe")),
-            "paypal": PayPalGateway(self.config.get("paypal")),
-            "square": SquareGateway(self.config.get("square")),
+            "stripe": StripeGateway(getattr(config, "stripe", None)),
+            "paypal": PayPalGateway(getattr(config, "paypal", None)),
+            "square": SquareGateway(getattr(config, "square", None)),
         }
 
     async def monitor_accounts(self):
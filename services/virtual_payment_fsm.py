@@ -3,6 +3,14 @@ import asyncio
 from loguru import logger
 from services.async_payment_fsm import AsyncPaymentFSM
 
+
+class _GatewaySucceeded(Exception):
+    """Raised inside the polling TaskGroup to cancel the other gateways."""
+    def __init__(self, gateway_name):
+        super().__init__(gateway_name)
+        self.gateway_name = gateway_name
+
+
 class VirtualPaymentFSM(AsyncPaymentFSM):
     """
     Asynchronous FSM for managing virtual payment options.
@@ -11,11 +19,18 @@ class VirtualPaymentFSM(AsyncPaymentFSM):
       - generate_payment_url(amount)
       - check_payment_status() returning "success", "pending", or "timeout"
       - process_refund(amount) for processing refunds (this could be simulated)
+    Providers may also expose a `status_changed` asyncio.Event; setting it wakes
+    the poller immediately instead of waiting out the poll interval. Set it on
+    the event loop thread (from other threads, use loop.call_soon_threadsafe).
     """
-    def __init__(self, payment_gateways, callback=None, poll_interval=1.0):
+    def __init__(self, payment_gateways, callback=None, poll_interval=1.0, pending_notify_every=5, total_timeout=10.0):
         super().__init__("VirtualPaymentFSM", callback=callback)
         self.payment_gateways = payment_gateways
         self.poll_interval = poll_interval
+        # Each gateway gets total_timeout seconds of polling before it times out
+        self.total_timeout = total_timeout
+        # Report "payment_pending" on the first pending poll, then once every N polls
+        self.pending_notify_every = max(1, pending_notify_every)
         self.virtual_payment_tasks = []
         self.active = False
         self.status = {"state": "idle"}
@@ -29,29 +44,23 @@ class VirtualPaymentFSM(AsyncPaymentFSM):
         """
         self.active = True
         self.status["state"] = "processing"
-        logger.info(f"VirtualPaymentFSM: Starting virtual payment for amount: ${amount:.2f}")
-        tasks = []
-        for gateway in self.payment_gateways:
-            task = asyncio.create_task(self._poll_gateway(gateway, amount))
-            tasks.append(task)
-            self.virtual_payment_tasks.append(task)
-
-        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        logger.info("VirtualPaymentFSM: Starting virtual payment for amount: ${:.2f}", amount)
         self.successful_gateway = None
-        for task in done:
-            result = task.result()
-            if result is not None:
-                self.successful_gateway = result
-                break
-
-        # Cancel any pending tasks
-        for task in pending:
-            task.cancel()
+        # A gateway that times out must not end the transaction while others may
+        # still succeed; the first success raises out of the group, which cancels the rest.
+        try:
+            async with asyncio.TaskGroup() as tg:
+                self.virtual_payment_tasks = [
+                    tg.create_task(self._race_gateway(gateway, amount), name=gateway)
+                    for gateway in self.payment_gateways
+                ]
+        except* _GatewaySucceeded as group:
+            self.successful_gateway = group.exceptions[0].gateway_name
         self.active = False
         if self.successful_gateway:
             self.status["state"] = "success"
             self.notify("payment_success", {"gateway": self.successful_gateway})
-        else:
+        elif self.status["state"] != "cancelled":
             self.status["state"] = "failure"
             self.notify("payment_failure", {})
         self.virtual_payment_tasks = []
@@ -73,7 +82,7 @@ class VirtualPaymentFSM(AsyncPaymentFSM):
             logger.debug("VirtualPaymentFSM: No active virtual payment tasks to cancel.")
 
     async def get_status(self) -> dict:
-        logger.debug(f"VirtualPaymentFSM: Current status: {self.status}")
+        logger.debug("VirtualPaymentFSM: Current status: {}", self.status)
         return self.status
 
     async def dispense_change(self):
@@ -93,30 +102,56 @@ class VirtualPaymentFSM(AsyncPaymentFSM):
             return None
         # Simulate asynchronous refund processing.
         await asyncio.sleep(self.poll_interval)
-        logger.info(f"VirtualPaymentFSM: Refunding ${amount:.2f} via {self.successful_gateway}.")
+        logger.info("VirtualPaymentFSM: Refunding ${:.2f} via {}.", amount, self.successful_gateway)
         self.notify("refund_processed", {"gateway": self.successful_gateway, "refund_amount": amount})
         return amount
 
+    async def _race_gateway(self, gateway_name, amount):
+        """Poll one gateway and signal the TaskGroup if it succeeds."""
+        # Each gateway polls in its own task, so this context tags only its
+        # records: everything logged while polling carries gateway in `extra`
+        with logger.contextualize(gateway=gateway_name):
+            result = await self._poll_gateway(gateway_name, amount)
+        if result is not None:
+            raise _GatewaySucceeded(result)
+
     async def _poll_gateway(self, gateway_name, amount):
         provider = self.payment_gateways[gateway_name]
         self.notify("payment_request", {"gateway": gateway_name, "status": "requested"})
         payment_url = provider.generate_payment_url(amount)
         self.notify("payment_url", {"gateway": gateway_name, "url": payment_url})
+        status_changed = getattr(provider, "status_changed", None)
+        loop = asyncio.get_running_loop()
+        # A wall-clock budget: early wakes from status_changed don't use it up
+        deadline = loop.time() + self.total_timeout
+        polls = 0
         try:
-            for i in range(10):
-                await asyncio.sleep(self.poll_interval)
+            while (remaining := deadline - loop.time()) > 0:
+                await self._wait_for_change(status_changed, min(self.poll_interval, remaining))
                 status = provider.check_payment_status()  # returns "success", "pending", or "timeout"
+                polls += 1
                 if status == "success":
                     self.notify("payment_success", {"gateway": gateway_name, "url": payment_url})
                     return gateway_name
                 elif status == "timeout":
                     self.notify("payment_timeout", {"gateway": gateway_name})
                     return None
-                else:
-                    self.notify("payment_pending", {"gateway": gateway_name})
+                elif (polls - 1) % self.pending_notify_every == 0:
+                    self.notify("payment_pending", {"gateway": gateway_name, "polls": polls})
             self.notify("payment_timeout", {"gateway": gateway_name})
             return None
         except asyncio.CancelledError:
-            logger.info(f"VirtualPaymentFSM: Polling cancelled for gateway: {gateway_name}")
+            self._log.info("VirtualPaymentFSM: Polling cancelled for gateway: {}", gateway_name)
             self.notify("payment_cancelled", {"gateway": gateway_name})
             raise
+
+    async def _wait_for_change(self, status_changed, timeout):
+        """Wait up to `timeout` seconds, or less if the provider signals a status change."""
+        if status_changed is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(status_changed.wait(), timeout=timeout)
+        except TimeoutError:
+            pass
+        status_changed.clear()
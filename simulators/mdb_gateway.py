@@ -25,27 +25,33 @@ class PaymentStrategy:
     BILL_DENOMS = [1.00, 5.00, 10.00, 20.00]
     METHODS = ["cash_coin", "cash_bill", "card", "nfc"]
 
+    def __init__(self, seed: int | None = None):
+        # Own generator per strategy: independent of the global random state,
+        # and a seed makes a simulated session reproducible.
+        self._rng = random.Random(seed)
+
     def pick_method(self) -> str:
-        return random.choice(self.METHODS)
+        return self._rng.choice(self.METHODS)
 
     def pick_coin(self) -> float:
-        return random.choice(self.COIN_DENOMS)
+        return self._rng.choice(self.COIN_DENOMS)
 
     def pick_bill(self) -> float:
-        return random.choice(self.BILL_DENOMS)
+        return self._rng.choice(self.BILL_DENOMS)
 
     def card_amount(self, price: float) -> float:
         """Return a card payment amount — sometimes exact, sometimes not."""
-        roll = random.random()
+        rng = self._rng
+        roll = rng.random()
         if roll < 0.4:
             # Underpay (partial auth)
-            return round(price * random.uniform(0.3, 0.9), 2)
+            return round(price * rng.uniform(0.3, 0.9), 2)
         elif roll < 0.8:
             # Exact or slight overpay
-            return round(price * random.uniform(1.0, 1.1), 2)
+            return round(price * rng.uniform(1.0, 1.1), 2)
         else:
             # Significant overpay
-            return round(price * random.uniform(1.5, 3.0), 2)
+            return round(price * rng.uniform(1.5, 3.0), 2)
 
 
 class MDBGatewaySimulator(ESP32Simulator):
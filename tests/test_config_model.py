@@ -98,3 +98,14 @@ def test_get_preferred_gateway_for_none():
     person = Person(preferred_comm=[Channel.snapchat])
     result = cfg.get_preferred_gateway_for(person)
     assert result is None
+
+
+def test_get_preferred_gateway_for_skips_unmapped_channel():
+    """A channel with no gateway field is skipped, not a KeyError."""
+    cfg = ConfigModel()
+    # model_construct skips enum validation, standing in for a channel added
+    # to Channel before CommunicationConfig grows a gateway for it
+    person = Person.model_construct(preferred_comm=["fax", Channel.email])
+    result = cfg.get_preferred_gateway_for(person)
+    assert result is not None
+    assert result[0] == Channel.email
@@ -0,0 +1,88 @@
+"""Tests for controller/event_store.py — JSON-lines event log and snapshots."""
+import gc
+
+import pytest
+
+from controller.event_store import EventStore, SnapshotEvent, TransactionEvent
+
+
+@pytest.fixture
+def store(tmp_path):
+    with EventStore(tmp_path / "events.log", tmp_path / "snapshot.json", snapshot_every=2) as s:
+        yield s
+
+
+def _txn(sku="ICE-10", amount=2.50):
+    return TransactionEvent(
+        channel="cash", sku=sku, amount=amount,
+        fsm_state_before="interacting_with_user", fsm_state_after="dispensing",
+    )
+
+
+class TestEventLog:
+    def test_append_and_replay_round_trip(self, store):
+        events = [_txn("A", 1.00), _txn("B", 2.00)]
+        for event in events:
+            store.append_event(event)
+        assert store.replay_events(TransactionEvent) == events
+
+    def test_replay_filters_by_type(self, store):
+        store.append_event(_txn())
+        store.append_event(SnapshotEvent(state={"x": 1}))
+        assert [e.type for e in store.replay_events(TransactionEvent)] == ["transaction"]
+        assert [e.state for e in store.replay_events(SnapshotEvent)] == [{"x": 1}]
+
+    def test_trusted_replay_matches_validated(self, store):
+        for sku in ("A", "B"):
+            store.append_event(_txn(sku))
+        assert store.replay_events(TransactionEvent, trusted=True) == store.replay_events(TransactionEvent)
+
+    def test_replay_empty_log(self, store):
+        assert store.replay_events(TransactionEvent) == []
+
+    def test_close_flushes_buffered_events(self, tmp_path):
+        store = EventStore(tmp_path / "events.log", tmp_path / "snapshot.json")
+        store.append_event(_txn())
+        store.close()
+        assert store.log_path.read_bytes().count(b"\n") == 1
+
+    def test_events_survive_without_close(self, tmp_path):
+        store = EventStore(tmp_path / "events.log", tmp_path / "snapshot.json")
+        store.append_event(_txn())
+        log_path = store.log_path
+        del store
+        gc.collect()
+        assert log_path.read_bytes().count(b"\n") == 1
+
+    def test_durable_append_reaches_file(self, store):
+        store.append_event(_txn(), durable=True)
+        assert store.log_path.read_bytes().count(b"\n") == 1
+
+    def test_replay_skips_malformed_lines(self, store):
+        store.append_event(_txn())
+        store.flush()
+        with store.log_path.open("a", encoding="utf-8") as f:
+            f.write("{not json\n")
+        store.append_event(_txn("B"))
+        assert [e.sku for e in store.replay_events(TransactionEvent)] == ["ICE-10", "B"]
+
+    def test_replay_reads_non_compact_lines(self, store):
+        store.flush()
+        line = _txn("HAND").model_dump_json().replace('"type":"transaction"', '"type": "transaction"')
+        with store.log_path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        assert [e.sku for e in store.replay_events(TransactionEvent)] == ["HAND"]
+
+
+class TestSnapshots:
+    def test_empty_snapshot_is_none(self, store):
+        assert store.load_latest_snapshot() is None
+
+    def test_checkpoint_writes_snapshot_and_clears_log(self, store):
+        store.append_event(_txn())
+        store.checkpoint({"count": 1})
+        assert store.load_latest_snapshot() is None
+        store.append_event(_txn())
+        store.checkpoint({"count": 2})
+        assert store.load_latest_snapshot().state == {"count": 2}
+        assert store.replay_events(TransactionEvent) == []
@@ -0,0 +1,76 @@
+"""Tests for controller/message_manager.py — sequential message display."""
+from controller.message_manager import DisplayDevice, MessageManager
+
+
+class FakeDevice(DisplayDevice):
+    """Records shown text; timers fire only when the test calls fire()."""
+
+    def __init__(self):
+        self.shown = []
+        self.timers = {}
+        self._next_id = 0
+
+    def show_text(self, message):
+        self.shown.append(message)
+
+    def clear(self):
+        self.shown.append("")
+
+    def schedule(self, delay_ms, callback):
+        self._next_id += 1
+        self.timers[self._next_id] = (delay_ms, callback)
+        return self._next_id
+
+    def cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def fire(self):
+        """Run the earliest-scheduled pending timer."""
+        timer_id = min(self.timers)
+        _, callback = self.timers.pop(timer_id)
+        callback()
+
+
+def test_messages_shown_in_sequence():
+    device = FakeDevice()
+    manager = MessageManager(device)
+    manager.post("one", 100)
+    manager.post("two", 100)
+    assert device.shown == ["one"]
+    device.fire()
+    assert device.shown == ["one", "two"]
+    device.fire()
+    assert device.shown == ["one", "two", ""]
+
+
+def test_short_messages_coalesce_into_one_frame():
+    device = FakeDevice()
+    manager = MessageManager(device, coalesce_window_ms=500)
+    for text in ("a", "b", "c"):
+        manager.post(text, 200)
+    manager.post("long", 5000)
+    assert device.shown == []
+    device.fire()
+    assert device.shown == ["a\nb\nc"]
+    assert next(iter(device.timers.values()))[0] == 600
+    device.fire()
+    assert device.shown == ["a\nb\nc", "long"]
+
+
+def test_clear_all_cancels_pending_message():
+    device = FakeDevice()
+    manager = MessageManager(device)
+    manager.post("one", 100)
+    manager.clear_all()
+    assert device.timers == {}
+    assert device.shown == ["one", ""]
+
+
+def test_post_after_idle_displays_immediately():
+    device = FakeDevice()
+    manager = MessageManager(device)
+    manager.post("one", 100)
+    device.fire()
+    assert device.timers == {}
+    manager.post("two", 100)
+    assert device.shown == ["one", "", "two"]
@@ -226,6 +226,25 @@ class TestVMCMQTTWiring:
         # _loop is None
         vmc._publish_status()
 
+    @pytest.mark.asyncio
+    async def test_publish_status_coalesces_bursts(self):
+        vmc = _make_vmc()
+        vmc.attach_to_loop(asyncio.get_running_loop())
+        mock_client = MagicMock()
+        mock_client.publish = AsyncMock()
+        vmc._mqtt_client = mock_client
+
+        vmc.start_interaction()
+        vmc.deposit_funds(1.00)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        mock_client.publish.assert_awaited_once()
+        topic, status = mock_client.publish.call_args.args
+        assert topic == "status"
+        assert status.state == "interacting_with_user"
+        assert status.credit_escrow == 1.00
+
     @pytest.mark.asyncio
     async def test_handle_mqtt_payment_deposits_funds(self):
         vmc = _make_vmc()
@@ -41,3 +41,8 @@ class TestPaymentStrategy:
         # At least some should differ from 3.00
         unique = set(round(a, 2) for a in amounts)
         assert len(unique) > 1
+
+    def test_seeded_strategies_repeat(self):
+        a, b = PaymentStrategy(seed=7), PaymentStrategy(seed=7)
+        assert [a.pick_method() for _ in range(20)] == [b.pick_method() for _ in range(20)]
+        assert [a.card_amount(3.00) for _ in range(20)] == [b.card_amount(3.00) for _ in range(20)]
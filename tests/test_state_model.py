@@ -0,0 +1,53 @@
+"""Tests for config/state_model.py — machine state and its event-log persistence."""
+import pytest
+
+from config.config_model import Channel
+from config.state_model import MachineState
+from controller.event_store import EventStore, TransactionEvent
+
+
+@pytest.fixture
+def store(tmp_path):
+    with EventStore(tmp_path / "events.log", tmp_path / "snapshot.json", snapshot_every=2) as s:
+        yield s
+
+
+def test_record_transaction_appends_event(store):
+    state = MachineState(fsm_state="idle")
+    state.record_transaction(Channel.email, "ICE-10", 2.50, event_store=store)
+    [event] = store.replay_events(TransactionEvent)
+    assert (event.channel, event.sku, event.amount) == ("email", "ICE-10", 2.50)
+    assert event.fsm_state_before is None and event.fsm_state_after is None
+
+
+def test_recorded_transaction_is_flushed(store):
+    state = MachineState(fsm_state="idle")
+    state.record_transaction(Channel.email, "ICE-10", 2.50, event_store=store)
+    assert store.log_path.read_bytes().count(b"\n") == 1
+
+
+def test_rebuild_from_snapshot_and_log(store):
+    state = MachineState(fsm_state="idle")
+    for sku in ("A", "B", "A"):
+        state.record_transaction(Channel.sms, sku, 1.00, event_store=store)
+        state.snapshot(store)
+    assert store.load_latest_snapshot() is not None
+
+    rebuilt = MachineState.from_event_store(store)
+    assert rebuilt.product_states["A"].vend_count == 2
+    assert rebuilt.product_states["B"].vend_count == 1
+    assert rebuilt.channel_states[Channel.sms].transactions == 3
+    assert rebuilt.channel_states[Channel.sms].revenue == pytest.approx(3.00)
+
+
+def test_empty_store_gives_idle_state(store):
+    assert MachineState.from_event_store(store).fsm_state == "idle"
+
+
+def test_to_file_round_trip(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = MachineState(fsm_state="idle")
+    state.record_transaction(Channel.email, "ICE-10", 2.50)
+    state.to_file(path)
+    assert MachineState.from_file(path) == state
+    assert not (tmp_path / "state.json.tmp").exists()
@@ -0,0 +1,118 @@
+"""Tests for services/virtual_payment_fsm.py — async virtual payment polling."""
+import asyncio
+
+import pytest
+from loguru import logger
+
+from services.virtual_payment_fsm import VirtualPaymentFSM
+
+
+class FakeProvider:
+    """Payment provider that returns a scripted sequence of statuses."""
+
+    def __init__(self, statuses):
+        self._statuses = list(statuses)
+
+    def generate_payment_url(self, amount):
+        return f"https://fake.example.com/pay?amount={amount}"
+
+    def check_payment_status(self):
+        return self._statuses.pop(0) if self._statuses else "pending"
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+def _make_fsm(providers, events, **kwargs):
+    kwargs.setdefault("total_timeout", 0.01)
+    return VirtualPaymentFSM(
+        providers,
+        callback=lambda event_type, data: events.append((event_type, data)),
+        poll_interval=0.001,
+        **kwargs,
+    )
+
+
+class TestPolling:
+    async def test_success_reports_gateway(self, events):
+        fsm = _make_fsm({"fake": FakeProvider(["pending", "success"])}, events)
+        result = await fsm.start_transaction(1.00)
+        assert result == "fake"
+        assert fsm.status["state"] == "success"
+
+    async def test_pending_notifications_are_throttled(self, events):
+        provider = FakeProvider(["pending"] * 9 + ["timeout"])
+        fsm = _make_fsm({"fake": provider}, events, pending_notify_every=5, total_timeout=1.0)
+        await fsm.start_transaction(1.00)
+        pending = [data["polls"] for event_type, data in events if event_type == "payment_pending"]
+        assert pending == [1, 6]
+
+    async def test_early_timeout_does_not_end_transaction(self, events):
+        providers = {
+            "slow": FakeProvider(["pending", "pending", "success"]),
+            "dead": FakeProvider(["timeout"]),
+        }
+        fsm = _make_fsm(providers, events)
+        assert await fsm.start_transaction(1.00) == "slow"
+
+    async def test_all_timeouts_report_failure(self, events):
+        fsm = _make_fsm({"a": FakeProvider(["timeout"]), "b": FakeProvider(["timeout"])}, events)
+        assert await fsm.start_transaction(1.00) is None
+        assert fsm.status["state"] == "failure"
+        assert events[-1] == ("payment_failure", {})
+
+    async def test_status_change_event_wakes_poller(self, events):
+        provider = FakeProvider(["success"])
+        provider.status_changed = asyncio.Event()
+        fsm = _make_fsm({"push": provider}, events)
+        fsm.poll_interval = 30.0
+        asyncio.get_running_loop().call_later(0.01, provider.status_changed.set)
+        assert await asyncio.wait_for(fsm.start_transaction(1.00), timeout=1.0) == "push"
+
+    async def test_cancel_transaction_stops_polling(self, events):
+        fsm = _make_fsm({"a": FakeProvider([]), "b": FakeProvider([])}, events)
+        fsm.poll_interval = 30.0
+        txn = asyncio.create_task(fsm.start_transaction(1.00))
+        await asyncio.sleep(0.01)
+        await fsm.cancel_transaction()
+        assert await asyncio.wait_for(txn, timeout=1.0) is None
+        assert fsm.status["state"] == "cancelled"
+        assert ("payment_failure", {}) not in events
+
+    async def test_polling_tasks_named_after_gateways(self, events):
+        fsm = _make_fsm({"a": FakeProvider([]), "b": FakeProvider([])}, events)
+        fsm.poll_interval = 30.0
+        txn = asyncio.create_task(fsm.start_transaction(1.00))
+        await asyncio.sleep(0.01)
+        assert [t.get_name() for t in fsm.virtual_payment_tasks] == ["a", "b"]
+        await fsm.cancel_transaction()
+        await asyncio.wait_for(txn, timeout=1.0)
+
+    async def test_total_timeout_is_wall_clock(self, events):
+        provider = FakeProvider([])
+        provider.status_changed = asyncio.Event()
+
+        def check_payment_status():
+            # A chatty provider: signals a change on every poll
+            provider.status_changed.set()
+            return "pending"
+
+        provider.check_payment_status = check_payment_status
+        fsm = _make_fsm({"push": provider}, events, total_timeout=0.05)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await fsm.start_transaction(1.00) is None
+        assert loop.time() - started >= 0.05
+        assert ("payment_timeout", {"gateway": "push"}) in events
+
+    async def test_gateway_records_carry_context(self, events):
+        extras = []
+        sink_id = logger.add(lambda message: extras.append(message.record["extra"]), level="DEBUG")
+        try:
+            fsm = _make_fsm({"fake": FakeProvider(["success"])}, events)
+            await fsm.start_transaction(1.00)
+        finally:
+            logger.remove(sink_id)
+        assert {"fsm": "VirtualPaymentFSM", "gateway": "fake"} in extras
@@ -1,4 +1,6 @@
 """Tests for controller/vmc.py — VMC finite state machine transitions."""
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock
 from config.config_model import ConfigModel
@@ -41,6 +43,26 @@ class TestDeposit:
         vmc.deposit_funds(2.50)
         assert vmc.credit_escrow == 3.50
 
+    def test_coin_deposits_do_not_drift(self, vmc):
+        vmc.deposit_funds(0.70)
+        vmc.deposit_funds(0.10)
+        assert vmc.credit_escrow == 0.80
+
+    async def test_concurrent_deposits_are_not_lost(self, vmc):
+        vmc.attach_to_loop(asyncio.get_running_loop())
+        # Each deposit now also resets the session timer from its own thread
+        vmc.start_interaction()
+
+        def deposit_many():
+            for _ in range(100):
+                vmc.deposit_funds(0.25)
+
+        await asyncio.gather(*(asyncio.to_thread(deposit_many) for _ in range(4)))
+        assert vmc.credit_escrow == 100.00
+        await asyncio.sleep(0.01)
+        assert vmc._funds_deposited.is_set()
+        assert [t for t in vmc._pending_tasks if not t.done()] == [vmc._session_timeout_task]
+
 
 class TestRefund:
     def test_refund_zeroes_credit(self, vmc):
@@ -93,6 +115,14 @@ class TestFSMTransitions:
         assert vmc.state == "idle"
         assert vmc.selected_product is None
 
+    def test_trigger_from_callback_runs_after_current_transition(self, vmc):
+        """queued=True: a trigger fired inside a callback waits for the outer transition."""
+        vmc.start_interaction()
+        vmc.dispense_product()
+        vmc.set_update_callback(lambda state, *_: state == "dispensing" and vmc.error_occurred())
+        vmc.complete_transaction()
+        assert vmc.state == "error"
+
     def test_reset_clears_insufficient_message(self, vmc):
         vmc.last_insufficient_message = "some message"
         vmc.error_occurred()
@@ -126,3 +156,62 @@ class TestCallbacks:
         vmc.set_message_callback(cb)
         vmc.deposit_funds(1.00)
         cb.assert_called()
+
+
+class TestPaymentFlow:
+    async def test_reselect_replaces_payment_flow(self, vmc):
+        vmc.attach_to_loop(asyncio.get_running_loop())
+        vmc.select_product(0)
+        first = vmc._payment_task
+        vmc.select_product(0)
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        assert vmc._payment_task is not first
+        assert not vmc._payment_task.done()
+
+    async def test_reselect_from_another_thread(self, vmc):
+        vmc.attach_to_loop(asyncio.get_running_loop())
+        await asyncio.to_thread(vmc.select_product, 0)
+        first = vmc._payment_task
+        await asyncio.to_thread(vmc.select_product, 0)
+        assert first.cancelled()
+        assert not vmc._payment_task.done()
+
+    async def test_deposit_wakes_payment_flow(self, vmc):
+        vmc.attach_to_loop(asyncio.get_running_loop())
+        vmc.select_product(0)
+        await asyncio.sleep(1.1)
+        assert vmc.state == "interacting_with_user"
+        vmc.deposit_funds(vmc.selected_product.price)
+        await asyncio.sleep(0.05)
+        assert vmc.state == "dispensing"
+
+
+class TestVirtualPayment:
+    def test_gateways_rotate_round_robin(self, vmc):
+        cb = MagicMock()
+        vmc.set_message_callback(cb)
+        names = list(vmc.payment_gateway_manager.gateways)
+        for _ in range(len(names) + 1):
+            vmc.initiate_virtual_payment(1.00)
+        used = [c.args[0].split("(")[1].split(")")[0] for c in cb.call_args_list]
+        assert used == names + names[:1]
+
+    def test_qr_code_reused_for_same_url(self, vmc):
+        images = []
+        vmc.set_qrcode_callback(images.append)
+        rounds = len(vmc.payment_gateway_manager.gateways)
+        for _ in range(2 * rounds):
+            vmc.initiate_virtual_payment(1.00)
+        assert images[:rounds] == images[rounds:]
+        assert all(a is b for a, b in zip(images[:rounds], images[rounds:]))
+
+    async def test_qr_code_delivered_on_loop(self, vmc):
+        loop = asyncio.get_running_loop()
+        vmc.attach_to_loop(loop)
+        delivered = loop.create_future()
+        vmc.set_qrcode_callback(delivered.set_result)
+        vmc.initiate_virtual_payment(2.00)
+        image = await asyncio.wait_for(delivered, timeout=5.0)
+        assert image is not None
+        vmc.cancel_pending_tasks()
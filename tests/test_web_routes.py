@@ -5,6 +5,7 @@ from config.config_model import ConfigModel
 from controller.vmc import VMC
 from web_interface.server import app
 from web_interface import routes
+from web_interface.routes import tail
 
 
 @pytest.fixture
@@ -101,3 +102,25 @@ class TestLogsEndpoint:
     def test_logs_returns_html(self, client):
         resp = client.get("/logs")
         assert resp.status_code == 200
+
+    def test_logs_follow_set_log_path(self, client, tmp_path, monkeypatch):
+        monkeypatch.setattr(routes, "LOG_PATH", routes.LOG_PATH)
+        log = tmp_path / "vmc.log"
+        log.write_text("from a custom log_dir\n")
+        routes.set_log_path(log)
+        assert "from a custom log_dir" in client.get("/logs").text
+
+
+class TestTail:
+    def test_missing_file(self, tmp_path):
+        assert tail(tmp_path / "missing.log") == ["[Log file not found]"]
+
+    def test_returns_last_lines_across_blocks(self, tmp_path):
+        log = tmp_path / "vmc.log"
+        log.write_text("".join(f"line {i}\n" for i in range(500)))
+        assert tail(log, lines=10, block_size=16) == [f"line {i}" for i in range(490, 500)]
+
+    def test_short_file(self, tmp_path):
+        log = tmp_path / "vmc.log"
+        log.write_text("only\n")
+        assert tail(log, lines=10) == ["only"]
@@ -26,28 +26,28 @@ def set_health_monitor(monitor):
     global health_monitor
     health_monitor = monitor
 
-LOG_PATH = Path("logs/vmc.log")
+# Default matches main.setup_logging(); main() sets the real path at startup
+LOG_PATH = Path("LOGS/vmc.log")
 
-def tail(file_path: Path, lines: int = 50) -> list[str]:
+def set_log_path(path):
+    global LOG_PATH
+    LOG_PATH = Path(path)
+
+def tail(file_path: Path, lines: int = 50, block_size: int = 4096) -> list[str]:
     if not file_path.exists():
         return ["[Log file not found]"]
-    
-    with file_path.open("rb") as f:
-        f.seek(0, 2)
-        end = f.tell()
-        buffer = bytearray()
-        count = 0
 
-        for pos in range(end - 1, -1, -1):
+    # Read whole blocks backwards from EOF until enough lines are buffered
+    with file_path.open("rb") as f:
+        pos = f.seek(0, 2)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= lines:
+            step = min(block_size, pos)
+            pos -= step
             f.seek(pos)
-            char = f.read(1)
-            if char == b'\n':
-                count += 1
-                if count >= lines:
-                    break
-            buffer.extend(char)
-        result = buffer[::-1].decode("utf-8", errors="replace")
-        return result.strip().splitlines()
+            data = f.read(step) + data
+    result = data.decode("utf-8", errors="replace")
+    return result.strip().splitlines()[-lines:]
 
 def attach_routes(app: FastAPI, templates: Jinja2Templates):
     router = APIRouter()